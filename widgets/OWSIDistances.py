@@ -7,10 +7,13 @@ import numpy as np
 
 from math import *
 from Orange.data import Domain, StringVariable, Table, ContinuousVariable, DiscreteVariable
-from Orange.widgets import widget, gui
+from Orange.widgets import widget, gui, settings
 from Orange.widgets.widget import Input, Output, Msg
 from Orange.misc import DistMatrix
 
+from .distcache import DistanceCache, fingerprint
+from .kernels import mixed_distances
+
 class OWDistances(widget.OWWidget):
     name = "Distances Discrete/Continuous"
     description = ('Compute distances for input data for numeric and symbolic values. '
@@ -24,14 +27,37 @@ class OWDistances(widget.OWWidget):
     class Outputs:
         distances = Output("Distances", DistMatrix)
 
+    # Bump when compute_distances changes, so that old cached results are not used
+    METRIC = dict(name="mixed normalized", version=2)
+
+    use_cache = settings.Setting(True)
+    cache_size = settings.Setting(1024)  # MB
+
     class Error(widget.OWWidget.Error):
         input_data_is_none = Msg('No data input')
 
+    class Warning(widget.OWWidget.Warning):
+        cache_error = Msg('Distance cache is not available: {}')
+
     def __init__(self):
         super().__init__()
 
         self.outDistances = None
 
+        box = gui.widgetBox(self.controlArea, "Cache")
+        gui.checkBox(box, self, "use_cache", "Reuse distances computed in earlier sessions")
+        gui.spin(box, self, "cache_size", 16, 1 << 20, 16,
+                 label="Maximum cache size (MB)", orientation="horizontal")
+        gui.button(box, self, "Clear cache", callback=self.clear_cache)
+        self.infoa = gui.widgetLabel(box, "")
+
+    def clear_cache(self):
+        self.Warning.cache_error.clear()
+        try:
+            DistanceCache().clear()
+        except OSError as ex:
+            self.Warning.cache_error(str(ex))
+
     @Inputs.data
     def set_distances(self, data):
         self.Error.clear()
@@ -39,47 +65,49 @@ class OWDistances(widget.OWWidget):
         if data is None:
             self.Error.input_data_is_none()
         else:
-            self.outDistances = self.compute_distances(data)
+            self.outDistances = self.cached_distances(data)
             self.Outputs.distances.send(self.outDistances)
 
-    def compute_distances(self, data):
+    def cached_distances(self, data):
+        self.Warning.cache_error.clear()
+        self.infoa.setText("")
+        if not self.use_cache:
+            return self.compute_distances(data)
+
+        cache = DistanceCache(max_bytes=self.cache_size << 20)
+        key = fingerprint(data, **self.METRIC)
+        try:
+            matrix = cache.get(key)
+        except OSError as ex:
+            self.Warning.cache_error(str(ex))
+            matrix = None
+        if matrix is not None:
+            self.infoa.setText("Distances loaded from cache")
+            return DistMatrix(matrix)
+
+        distances = self.compute_distances(data)
+        try:
+            cache.put(key, distances)
+        except OSError as ex:
+            self.Warning.cache_error(str(ex))
+        return distances
 
-        nb_data = len(data)
-        nb_domain = len(data.domain)
-        distances = [[] for _ in range(nb_data)]
-
-        # look for the biggest and the lowest value of each continuous column
-        min_max = []
-        for i in range(nb_domain):
-            if isinstance(data.domain[i], ContinuousVariable):
-                min_max.append([data[0][data.domain[i]], data[1][data.domain[i]]])
-                for j in range(1, nb_data):
-                    if data[j][data.domain[i]] < min_max[-1][0]:
-                        min_max[-1][0] = data[j][data.domain[i]]
-                    if data[j][data.domain[i]] > min_max[-1][1]:
-                        min_max[-1][1] = data[j][data.domain[i]]
-
-        # Compute the difference between the biggest and lowest value for each continuous columns
-        diff_extrema = [extrema[1] - extrema[0] for extrema in min_max]
-
-        # Compute the distances between each data
-        for i in range(nb_data):
-            for j in range(i, nb_data):
-
-                sum_continuous_values = 0 # Sum of the squares of the difference of two data for each continuous columns
-                sum_discrete_values = 0 # Sum of distances of two points for each discrete columns (0 if equals, 1 else)
-
-                for k in range(nb_domain):
-                    if isinstance(data.domain[k], ContinuousVariable):
-                        if diff_extrema[k] != 0:
-                            sum_continuous_values += ((data[i][data.domain[k]] - data[j][data.domain[k]]) / (diff_extrema[k]))**2
-                    else:
-                        if data[i][data.domain[k]] != data[j][data.domain[k]]:
-                            sum_discrete_values += 1
-
-                sum = (sqrt(sum_continuous_values) + sum_discrete_values) / nb_domain
-                distances[i].append(sum)
-                if i != j:
-                    distances[j].append(sum)
-
-        return DistMatrix(np.array(distances))
\ No newline at end of file
+    def compute_distances(self, data):
+        domain = data.domain
+        values = np.hstack((data.X, data.Y.reshape(len(data), -1)))
+        is_continuous = np.array([isinstance(var, ContinuousVariable)
+                                  for var in domain.variables], dtype=bool)
+
+        # Scale each continuous column by the difference between its
+        # biggest and lowest value; constant columns are left out
+        continuous = values[:, is_continuous]
+        if continuous.size:
+            diff_extrema = np.nanmax(continuous, axis=0) - np.nanmin(continuous, axis=0)
+            nonconstant = diff_extrema != 0
+            continuous = continuous[:, nonconstant] / diff_extrema[nonconstant]
+
+        # Discrete columns add 1 for each different value
+        discrete = values[:, ~is_continuous]
+
+        distances = mixed_distances(continuous, discrete, len(domain.variables))
+        return DistMatrix(distances)
\ No newline at end of file
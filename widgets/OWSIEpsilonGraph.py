@@ -8,12 +8,15 @@ import scipy.sparse as sp
 
 from AnyQt.QtCore import QLineF, QSize
 
-from Orange.data import Domain, StringVariable, Table
+from Orange.data import Domain, StringVariable, Table, ContinuousVariable
 from Orange.misc import DistMatrix
 from Orange.widgets import gui, widget, settings
 from Orange.widgets.widget import Input, Output
 from orangecontrib.network.network import Network
 
+from .unionfind import sorted_edges, component_sweep, threshold_edges
+from .incremental import EpsilonIndex, is_extension, merge_values
+
 import pyqtgraph as pg # lib for graphs, used for Histogram
 
 
@@ -33,14 +36,23 @@ class OWNxEpsilonGraph(widget.OWWidget):
         network = Output("Network", Network)
         data = Output("Data", Table)
         distances = Output("Distances", DistMatrix)
+        sweep_curve = Output("Components Curve", Table)
+        sweep_network = Output("Sweep Network", Network)
 
     resizing_enabled = False
 
+    sweep = settings.Setting(False)
+    sweep_thresholds = settings.Setting("")
+    selected_threshold = settings.Setting(0)
+    incremental = settings.Setting(False)
+
     class Warning(widget.OWWidget.Warning):
         large_number_of_nodes = widget.Msg('Large number of nodes/edges; performance will be hindered')
 
     class Error(widget.OWWidget.Error):
         number_of_edges = widget.Msg('Estimated number of edges is too high ({})')
+        sweep_too_large = widget.Msg('Too many edges in the sweep network ({})')
+        invalid_thresholds = widget.Msg('Sweep thresholds must be numbers separated by commas')
 
     def __init__(self):
         super().__init__()
@@ -50,12 +62,20 @@ class OWNxEpsilonGraph(widget.OWWidget):
         self.matrix = None
         self.graph = None
         self.graph_matrix = None
+        self.sweep_edges = None
+        self.sweep_result = None
+        self.items = None
+        self.edge_index = None
 
         self.histogram = Histogram(self)
         self.mainArea.layout().addWidget(self.histogram)
+        self.components_plot = ComponentsCurve(self)
+        self.components_plot.setVisible(self.sweep)
+        self.mainArea.layout().addWidget(self.components_plot)
         self.mainArea.setMinimumWidth(500)
         self.mainArea.setMinimumHeight(100)
         self.addHistogramControls()
+        self.addSweepControls()
 
         # info
         boxInfo = gui.widgetBox(self.controlArea, box="Info")
@@ -78,25 +98,91 @@ class OWNxEpsilonGraph(widget.OWWidget):
                                         keyboardTracking=False,
                                         controlWidth=60)
         self.histogram.region.sigRegionChangeFinished.connect(self.spinboxFromHistogramRegion)
+        gui.checkBox(boxHisto, self, 'incremental',
+                     'Update incrementally when rows are appended',
+                     callback=self.generateGraph)
+
+    def addSweepControls(self):
+        boxSweep = gui.widgetBox(self.controlArea, box="Epsilon sweep")
+        gui.checkBox(boxSweep, self, 'sweep', 'Plot connected components',
+                     callback=self.sweepChanged)
+        gui.lineEdit(boxSweep, self, 'sweep_thresholds',
+                     label='Thresholds', orientation="horizontal",
+                     callback=self.thresholdsChanged,
+                     tooltip='Comma separated epsilons to choose from')
+        self.threshold_combo = gui.comboBox(
+            boxSweep, self, 'selected_threshold', label='Output network for',
+            orientation="horizontal", callback=self.sendSweepSignals)
+        self.updateThresholdCombo()
+
+    def sweepEpsilons(self):
+        self.Error.invalid_thresholds.clear()
+        try:
+            return [float(x) for x in self.sweep_thresholds.split(',')
+                    if x.strip()]
+        except ValueError:
+            self.Error.invalid_thresholds()
+            return []
+
+    def updateThresholdCombo(self):
+        selected = self.selected_threshold
+        epsilons = self.sweepEpsilons()
+        self.threshold_combo.clear()
+        self.threshold_combo.addItems(['epsilon = %g' % eps for eps in epsilons])
+        self.selected_threshold = min(selected, max(len(epsilons) - 1, 0))
+
+    def thresholdsChanged(self):
+        self.updateThresholdCombo()
+        self.sendSweepSignals()
 
     # Processing distance input
     @Inputs.distances
     def set_matrix(self, data):        
         if data is not None and not data.size:
             data = None
+        old_matrix = self.matrix
         self.matrix = data
+        self.sweep_edges = None
+        self.items = None
         if data is None:
             self.histogram.setValues([])
+            self.computeSweep()
             self.generateGraph()
             return
 
         if self.matrix.row_items is None:
             self.matrix.row_items = list(range(self.matrix.shape[0]))
 
+        # only the new rows are compared with epsilon and sorted
+        if self.incremental and is_extension(old_matrix, data):
+            if self.edge_index is not None:
+                self.edge_index.insert(data)
+            values = merge_values(self.matrix_values, data, old_matrix.shape[0])
+        else:
+            self.edge_index = None
+            values = np.sort(np.ravel(self.matrix))
+
         # draw histogram
-        self.matrix_values = values = sorted(self.matrix.flat)
+        self.matrix_values = values
         self.histogram.setValues(values)
 
+        self.computeSweep()
+        self.generateGraph()
+
+    # Sorting the edges once, then every threshold is a prefix of them
+    def computeSweep(self):
+        self.sweep_result = None
+        if self.matrix is None or not self.sweep:
+            self.components_plot.setValues(None)
+            return
+        if self.sweep_edges is None:
+            self.sweep_edges = sorted_edges(self.matrix)
+        self.sweep_result = component_sweep(*self.sweep_edges, self.matrix.shape[0])
+        self.components_plot.setValues(*self.sweep_result)
+
+    def sweepChanged(self):
+        self.components_plot.setVisible(self.sweep)
+        self.computeSweep()
         self.generateGraph()
 
     def generateGraph(self, N_changed=False):
@@ -123,6 +209,9 @@ class OWNxEpsilonGraph(widget.OWWidget):
         nEdgesEstimate = 2 * sum(y for x, y in zip(self.histogram.xData, self.histogram.yData)
                                  if x <= self.epsilon)
 
+        if self.sweep_edges is not None:
+            nEdgesEstimate = self.sweepEdgeCount(self.epsilon)
+
         if nEdgesEstimate > 200000:
             self.graph = None
             nedges = 0
@@ -149,12 +238,22 @@ class OWNxEpsilonGraph(widget.OWWidget):
                 items = Table(
                     Domain([], metas=[StringVariable('label')]),
                     items)
-
-            mask = self.matrix <= self.epsilon
-            weights = matrix[mask]
-            if weights.size:
-                weights = np.max(weights) - weights
-            edges = sp.csr_matrix((weights, mask.nonzero()))
+            self.items = items
+
+            if self.sweep_edges is not None:
+                edges = threshold_edges(*self.sweep_edges, self.matrix.shape[0],
+                                        self.epsilon)
+            elif self.incremental:
+                if self.edge_index is None or self.edge_index.epsilon != self.epsilon:
+                    self.edge_index = EpsilonIndex(self.matrix, self.epsilon)
+                edges = self.edge_index.csr()
+            else:
+                self.edge_index = None
+                mask = self.matrix <= self.epsilon
+                weights = matrix[mask]
+                if weights.size:
+                    weights = np.max(weights) - weights
+                edges = sp.csr_matrix((weights, mask.nonzero()))
             self.graph = Network(items, edges)
 
         self.graph_matrix = self.matrix
@@ -181,12 +280,55 @@ class OWNxEpsilonGraph(widget.OWWidget):
 
         self.sendSignals()
         self.histogram.setRegion(0, self.epsilon)
+        self.components_plot.setEpsilon(self.epsilon)
 
     # Outputs processing (has to be called if any modification on the network happens)
     def sendSignals(self):
         self.Outputs.network.send(self.graph)
         self.Outputs.distances.send(self.graph_matrix)
         self.Outputs.data.send(self.matrix)
+        self.sendSweepSignals()
+
+    def sweepEdgeCount(self, epsilon):
+        """Number of edges (both directions) of the graph at epsilon."""
+        return 2 * np.searchsorted(self.sweep_edges[2], epsilon, side='right')
+
+    def sendSweepSignals(self):
+        if self.sweep_result is None:
+            self.Outputs.sweep_curve.send(None)
+            self.Outputs.sweep_network.send(None)
+            return
+
+        thresholds, components, largest = self.sweep_result
+        domain = Domain([ContinuousVariable('epsilon'),
+                         ContinuousVariable('components'),
+                         ContinuousVariable('largest component')])
+        curve = Table.from_numpy(
+            domain, np.column_stack((thresholds, components, largest)))
+        self.Outputs.sweep_curve.send(curve)
+
+        epsilons = self.sweepEpsilons()
+        if not epsilons:
+            self.Outputs.sweep_network.send(None)
+            return
+        eps = epsilons[min(self.selected_threshold, len(epsilons) - 1)]
+
+        # same limit as for the main network
+        n = self.matrix.shape[0]
+        self.Error.sweep_too_large.clear()
+        nEdges = self.sweepEdgeCount(eps)
+        if nEdges > 200000:
+            self.Error.sweep_too_large(nEdges)
+            self.Outputs.sweep_network.send(None)
+            return
+
+        items = self.items
+        if items is None:
+            items = Table(Domain([], metas=[StringVariable('label')]),
+                          [[i] for i in range(n)])
+        network = Network(items, threshold_edges(*self.sweep_edges, n, eps),
+                          name='epsilon = %g' % eps)
+        self.Outputs.sweep_network.send(network)
 
     def changeUpperSpin(self):
         if self.matrix is None: return
@@ -257,13 +399,21 @@ class Histogram(pg.PlotWidget):
         return self.region.getRegion()
 
     def setValues(self, values):
+        # values are sorted: bins are counted by bisection, without a pass
+        # over all the values
         self.fillCurve.setData([0,1], [0])
         if not len(values):
             self.curve.setData([0, 1], [0])
             self.setBoundary(0, 0)
             return
         nbins = int(min(np.sqrt(len(values)), 100))
-        freq, edges = np.histogram(values, bins=nbins)
+        low, high = values[0], values[-1]
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, nbins + 1)
+        counts = np.searchsorted(values, edges)
+        counts[-1] = len(values)  # the last bin includes its right edge
+        freq = np.diff(counts)
         self.curve.setData(edges, freq)
         self.setBoundary(edges[0], edges[-1])
         self.autoRange()
@@ -276,6 +426,38 @@ class Histogram(pg.PlotWidget):
     def yData(self):
         return self.curve.yData
 
+
+class ComponentsCurve(pg.PlotWidget):
+    """Number of connected components and size of the largest one
+    as functions of epsilon."""
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.plotItem.addLegend()
+        self.components = self.plot([], [], pen=pg.mkPen('b', width=2),
+                                    name='Components')
+        self.largest = self.plot([], [], pen=pg.mkPen('r', width=2),
+                                 name='Largest component')
+        self.line = pg.InfiniteLine(0, movable=False, pen=pg.mkPen('k'))
+        self.addItem(self.line)
+        self.plotItem.vb.setMouseEnabled(x=False, y=False)
+        self.setLabel('bottom', 'epsilon')
+        self.setLabel('left', 'nodes')
+        self.setMinimumHeight(150)
+
+    def setValues(self, thresholds=None, components=None, largest=None):
+        if thresholds is None:
+            self.components.setData([], [])
+            self.largest.setData([], [])
+            return
+        # each count holds until the next merge: draw as steps
+        x = np.repeat(thresholds, 2)[1:]
+        self.components.setData(x, np.repeat(components, 2)[:-1])
+        self.largest.setData(x, np.repeat(largest, 2)[:-1])
+        self.autoRange()
+
+    def setEpsilon(self, epsilon):
+        self.line.setValue(epsilon)
+
 # main class
 if __name__ == "__main__":
     from AnyQt.QtWidgets import QApplication
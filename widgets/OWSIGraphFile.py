@@ -0,0 +1,168 @@
+# Widget for saving and loading graphs as CSR arrays
+#
+# Created on 2026-10-19
+
+import os
+
+import numpy as np
+
+from AnyQt.QtWidgets import QFileDialog
+
+from Orange.data import Domain, StringVariable, ContinuousVariable, Table
+from Orange.widgets import gui, widget, settings
+from Orange.widgets.widget import Input, Output, Msg
+from orangecontrib.network.network import Network, DirectedEdges, UndirectedEdges
+
+from .graphio import save_npz, load_npz, save_raw, load_raw, read_edge_list
+
+
+class OWSIGraphFile(widget.OWWidget):
+    name = "Graph File (CSR)"
+    description = ('Save and load graphs as compressed .npz CSR files, '
+                   'as memory-mapped index/weight arrays, '
+                   'or load them from large edge-list files.')
+    icon = "icons/converter-icon.png"
+    priority = 6460
+
+    class Inputs:
+        network = Input("Network", Network)
+
+    class Outputs:
+        network = Output("Network", Network)
+
+    resizing_enabled = False
+    want_main_area = False
+
+    NPZ, RAW, EDGE_LIST = range(3)
+    formats = ("Compressed CSR (.npz)",
+               "Memory-mapped arrays (directory)",
+               "Edge list (load only)")
+
+    file_format = settings.Setting(NPZ)
+    directed = settings.Setting(False)
+    last_dir = settings.Setting(os.path.expanduser("~"))
+
+    class Warning(widget.OWWidget.Warning):
+        several_edge_types = Msg('Only the first set of edges is saved')
+
+    class Error(widget.OWWidget.Error):
+        read_error = Msg('Cannot read the graph: {}')
+        write_error = Msg('Cannot write the graph: {}')
+        no_network = Msg('No network to save')
+
+    def __init__(self):
+        super().__init__()
+
+        self.network = None
+
+        box = gui.widgetBox(self.controlArea, "Format")
+        gui.radioButtons(box, self, "file_format", btnLabels=self.formats)
+        gui.checkBox(box, self, "directed", "Edge lists are directed")
+
+        box = gui.widgetBox(self.controlArea, orientation="horizontal")
+        gui.button(box, self, "Load...", callback=self.browse_load)
+        gui.button(box, self, "Save...", callback=self.browse_save)
+
+        box = gui.widgetBox(self.controlArea, "Info")
+        self.infoa = gui.widgetLabel(box, "No graph loaded.")
+
+    @Inputs.network
+    def set_network(self, network):
+        self.Warning.clear()
+        self.network = network
+        if network is not None and len(network.edges) > 1:
+            self.Warning.several_edge_types()
+
+    def browse_load(self):
+        if self.file_format == self.RAW:
+            filename = QFileDialog.getExistingDirectory(
+                self, "Open graph directory", self.last_dir)
+        else:
+            file_filter = "Compressed CSR (*.npz)" if self.file_format == self.NPZ \
+                else "Edge list (*.txt *.csv *.tsv *.edges *.el);;All files (*)"
+            filename, _ = QFileDialog.getOpenFileName(
+                self, "Open graph", self.last_dir, file_filter)
+        if filename:
+            self.last_dir = os.path.dirname(filename)
+            self.load(filename)
+
+    def browse_save(self):
+        self.Error.clear()
+        if self.network is None:
+            self.Error.no_network()
+            return
+        if self.file_format == self.RAW:
+            filename = QFileDialog.getExistingDirectory(
+                self, "Save graph to directory", self.last_dir)
+        elif self.file_format == self.NPZ:
+            filename, _ = QFileDialog.getSaveFileName(
+                self, "Save graph", self.last_dir, "Compressed CSR (*.npz)")
+        else:
+            self.Error.write_error("edge lists can only be loaded")
+            return
+        if filename:
+            self.last_dir = os.path.dirname(filename)
+            self.save(filename)
+
+    def load(self, filename):
+        self.Error.clear()
+        try:
+            if self.file_format == self.NPZ:
+                matrix, labels, directed = load_npz(filename)
+            elif self.file_format == self.RAW:
+                matrix, labels, directed = load_raw(filename)
+            else:
+                matrix, labels, directed = read_edge_list(filename, self.directed)
+        except (OSError, ValueError, KeyError) as ex:
+            self.Error.read_error(str(ex))
+            self.Outputs.network.send(None)
+            return
+
+        n = matrix.shape[0]
+        labels = np.asarray(labels)
+        # numeric labels stay a numeric column: no Python object per node
+        if labels.dtype.kind in "iuf":
+            variable = ContinuousVariable(
+                'label', number_of_decimals=0 if labels.dtype.kind in "iu" else None)
+            metas = labels.astype(float).reshape(-1, 1)
+        else:
+            variable = StringVariable('label')
+            metas = labels.astype(object).reshape(-1, 1)
+        items = Table.from_numpy(
+            Domain([], metas=[variable]), np.empty((n, 0)), metas=metas)
+        edges = (DirectedEdges if directed else UndirectedEdges)(matrix)
+        network = Network(items, edges, name=os.path.basename(filename))
+
+        self.infoa.setText("%d nodes, %d edges" % (n, network.number_of_edges()))
+        self.Outputs.network.send(network)
+
+    def save(self, filename):
+        edges = self.network.edges[0]
+        nodes = self.network.nodes
+        if isinstance(nodes, Table) and nodes.domain.metas:
+            labels = nodes.metas[:, 0]
+            if nodes.domain.metas[0].is_continuous:
+                labels = labels.astype(float)
+                if np.all(labels == np.round(labels)):
+                    labels = labels.astype(np.int64)
+            else:
+                labels = labels.astype(str)
+        else:
+            labels = np.arange(self.network.number_of_nodes())
+        try:
+            if self.file_format == self.NPZ:
+                save_npz(filename, edges.edges, labels, edges.directed)
+            else:
+                save_raw(filename, edges.edges, labels, edges.directed)
+        except OSError as ex:
+            self.Error.write_error(str(ex))
+            return
+        self.infoa.setText("Saved to %s" % os.path.basename(filename))
+
+
+if __name__ == "__main__":
+    from AnyQt.QtWidgets import QApplication
+    a = QApplication([])
+    ow = OWSIGraphFile()
+    ow.show()
+    a.exec_()
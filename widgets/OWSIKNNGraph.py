@@ -9,6 +9,9 @@ from Orange.widgets import gui, widget, settings
 from Orange.widgets.widget import Input, Output, Msg
 from orangecontrib.network.network import Network
 
+from .kernels import knn, mutual_knn, shared_neighbors
+from .incremental import KNNIndex, is_extension
+
 
 class OWSIKNNGraph(widget.OWWidget):
     name = "K nearest neighbors graph generator"
@@ -26,7 +29,15 @@ class OWSIKNNGraph(widget.OWWidget):
         distances = Output("Distances", DistMatrix)
 
 
+    KNN, MUTUAL_KNN, SNN = range(3)
+    graph_types = ("k nearest neighbors",
+                   "Mutual k nearest neighbors",
+                   "Shared nearest neighbors")
+
     kNN = settings.Setting(2)
+    graph_type = settings.Setting(KNN)
+    min_shared = settings.Setting(1)
+    incremental = settings.Setting(False)
 
 
     class Warning(widget.OWWidget.Warning):
@@ -48,6 +59,7 @@ class OWSIKNNGraph(widget.OWWidget):
 
         self.graph = None
         self.graphMatrix = None
+        self.knn_index = None
 
         self.pconnected = 0
         self.nedges = 0
@@ -65,6 +77,18 @@ class OWSIKNNGraph(widget.OWWidget):
         knn = gui.spin(hbox, self, "kNN", 1, 1000, 1,
                        label="Nearest neighbor", orientation='horizontal',
                        callback=self.generateGraph, callbackOnReturn=1)
+        gui.checkBox(self.controlArea, self, "incremental",
+                     "Update incrementally when rows are appended",
+                     callback=self.generateGraph)
+
+        box = gui.widgetBox(self.controlArea, "Graph type")
+        gui.radioButtons(box, self, "graph_type", btnLabels=self.graph_types,
+                         callback=self.generateGraph)
+        gui.spin(box, self, "min_shared", 1, 1000, 1,
+                 label="Minimum shared neighbors", orientation='horizontal',
+                 callback=self.generateGraph, callbackOnReturn=1,
+                 tooltip='Pairs sharing fewer neighbors are not linked '
+                         '(shared nearest neighbors only)')
 
 
     @Inputs.distances
@@ -72,10 +96,18 @@ class OWSIKNNGraph(widget.OWWidget):
         if matrix is None:
             self.Error.input_distances_is_none()
         else:
+            old_matrix = self.graphMatrix
             self.graphMatrix = matrix
             if self.graphMatrix.row_items is None:
                 self.graphMatrix.row_items = list(range(self.graphMatrix.shape[0]))
 
+            # only the neighborhoods of the new rows are searched
+            if self.incremental and self.knn_index is not None \
+                    and is_extension(old_matrix, matrix):
+                self.knn_index.insert(matrix)
+            else:
+                self.knn_index = None
+
             self.generateGraph()
         
         self.send_matrix()
@@ -97,9 +129,11 @@ class OWSIKNNGraph(widget.OWWidget):
             self.graph = None
             return
 
+        # The plain kNN graph has n * k edges and is rejected before the
+        # search; mutual and shared neighbors graphs are checked once built
         nEdges = len(self.graphMatrix) * self.kNN
 
-        if nEdges > 200000:
+        if self.graph_type == self.KNN and nEdges > 200000:
             self.graph = None
             self.Error.number_of_edges(nEdges)
         else:
@@ -125,32 +159,36 @@ class OWSIKNNGraph(widget.OWWidget):
                     items)
 
             self.Warning.kNN_too_large.clear()
-            if self.kNN >= self.graphMatrix.shape[0]:
-                self.Warning.kNN_too_large(self.graphMatrix.shape[0] - 1)
-
-            nb_data = len(matrix)
-            row_index = []
-            col_index = []
-            distances_data = []
-
-            for i in range(nb_data):
-                distances = []
-                for j in range(nb_data):
-                    distances.append((self.graphMatrix[i][j], j))
-                distances.sort()
-                for k in range(self.kNN):
-                    row_index.append(i)
-                    col_index.append(distances[k][1])
-                    distances_data.append(distances[k][0])
-
-            row = np.array(row_index)
-            col = np.array(col_index)
-            weights = np.array(distances_data)
-
-            edges = sp.csr_matrix((weights, (row, col)))
-            graph = Network(items, edges)
-
-            self.graph = graph
+            k = self.kNN
+            if k >= self.graphMatrix.shape[0]:
+                k = self.graphMatrix.shape[0] - 1
+                self.Warning.kNN_too_large(k)
+
+            nb_data = len(matrix)
+            if self.incremental:
+                if self.knn_index is None or self.knn_index.k != k:
+                    self.knn_index = KNNIndex(self.graphMatrix, k)
+                nearest = self.knn_index.nearest
+            else:
+                self.knn_index = None
+                nearest = knn(self.graphMatrix, k)
+
+            if self.graph_type == self.SNN:
+                # weight = number of neighbors the two kNN lists have in common
+                edges = shared_neighbors(nearest, nb_data, self.min_shared)
+            else:
+                if self.graph_type == self.MUTUAL_KNN:
+                    row, col = mutual_knn(nearest, nb_data).nonzero()
+                else:
+                    row = np.repeat(np.arange(nb_data), k)
+                    col = nearest.ravel()
+                weights = np.asarray(self.graphMatrix)[row, col]
+                edges = sp.csr_matrix((weights, (row, col)), shape=(nb_data, nb_data))
+            if edges.nnz > 200000:
+                self.graph = None
+                self.Error.number_of_edges(edges.nnz)
+            else:
+                self.graph = Network(items, edges)
 
         if self.graph is None:
             self.pconnected = 0
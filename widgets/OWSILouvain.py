@@ -3,9 +3,9 @@
 # Author - Yanis Richard - Mael Bervet
 # Created on 2019-11-25
 
-import numpy
+import numpy as np
 
-from Orange.data import Domain, StringVariable, Table, DiscreteVariable
+from Orange.data import Domain, StringVariable, Table, DiscreteVariable, ContinuousVariable
 from Orange.widgets import widget, gui
 from Orange.widgets.utils.signals import Input, Output
 
@@ -24,6 +24,7 @@ class OWDataSamplerA(widget.OWWidget):
 
     class Outputs:
         sample = Output("Sampled Data", Table)
+        statistics = Output("Community Statistics", Table)
 
     want_main_area = False
 
@@ -41,18 +42,55 @@ class OWDataSamplerA(widget.OWWidget):
             # Run louvain
             partition = cl.best_partition(dataset)
 
-            # Create table
-            communities = ["C" + str(x) for x in set(partition.values())]
+            # Create table: one integer code per node, in the order of the partition
+            nodes = list(partition)
+            codes = np.fromiter(partition.values(), dtype=int, count=len(nodes))
+            n_communities = codes.max() + 1 if len(codes) else 0
+            communities = ["C" + str(x) for x in range(n_communities)]
             variable = DiscreteVariable("Community", values=communities)
 
             domain = Domain([variable])
 
-            clusters = Table(domain, [["C" + str(x)] for x in partition.values()])
+            clusters = Table.from_numpy(domain, codes.reshape(-1, 1).astype(float))
 
-            self.infoa.setText("%d clusters found" % (max([x for x in partition.values()])+1))
-            sample = clusters
+            # Community sizes, internal weights and modularity
+            adjacency = nx.to_scipy_sparse_array(dataset, nodelist=nodes, weight="weight")
+            sizes, internal, modularity = community_statistics(adjacency, codes, n_communities)
+            statistics = Table.from_numpy(
+                Domain([variable, ContinuousVariable("Size"),
+                        ContinuousVariable("Internal weight"),
+                        ContinuousVariable("Modularity")]),
+                np.column_stack((np.arange(n_communities), sizes, internal, modularity)))
+
+            self.infoa.setText("%d clusters found, modularity %.3f"
+                               % (n_communities, modularity.sum()))
             self.Outputs.sample.send(clusters)
+            self.Outputs.statistics.send(statistics)
         else:
             self.infoa.setText(
                 "No data on input yet, waiting to get something.")
-            self.Outputs.sample.send(None)
\ No newline at end of file
+            self.Outputs.sample.send(None)
+            self.Outputs.statistics.send(None)
+
+
+def community_statistics(adjacency, codes, n_communities):
+    """Size, internal edge weight and modularity contribution of each
+    community, aggregated over the edges of the (symmetric) adjacency
+    matrix. Self loops count twice in the degrees, as in networkx."""
+    edges = adjacency.tocoo()
+    loops = edges.row == edges.col
+    degrees = np.asarray(adjacency.sum(axis=1), dtype=float).ravel()
+    degrees += np.bincount(edges.row[loops], edges.data[loops], len(codes))
+    total = degrees.sum() / 2
+
+    sizes = np.bincount(codes, minlength=n_communities)
+    # other edges appear twice in the matrix, self loops once
+    inside = codes[edges.row] == codes[edges.col]
+    weights = np.where(loops, edges.data, edges.data / 2)[inside]
+    internal = np.bincount(codes[edges.row[inside]], weights, n_communities)
+    community_degrees = np.bincount(codes, degrees, n_communities)
+    if total:
+        modularity = internal / total - (community_degrees / (2 * total)) ** 2
+    else:
+        modularity = np.zeros(n_communities)
+    return sizes, internal, modularity
\ No newline at end of file
@@ -15,6 +15,8 @@ from Orange.widgets import gui, widget, settings
 from Orange.widgets.widget import Input, Output, Msg
 from orangecontrib.network.network import Network
 
+from .kernels import rng_edges
+
 import pyqtgraph as pg # lib for graphs, used for Histogram
 
 
@@ -53,27 +55,10 @@ class OWSIRNGraph(widget.OWWidget):
         if data is not None:
 
             nb_data = len(data)
-            row_data = [] # first index of the points for each edges
-            col_data = [] # second index of the points for each edges
-            data_data = [] # edge weigth of each edges
-
-            for i in range(nb_data):
-                for j in range(nb_data):
-                    add_edge = True
-                    k = 0
-                    while add_edge and k < nb_data:
-                        if i != j and i != k and data[i][k] < data[i][j] and data[j][k] < data[i][j]:
-                            add_edge = False
-                        k += 1
-                    if add_edge:
-                        row_data.append(i)
-                        col_data.append(j)
-                        data_data.append(data[i][j])
-
-            # transform to np array
-            row = np.array(row_data)
-            col = np.array(col_data)
-            new_data = np.array(data_data)
+
+            # i and j are linked unless a third point k is closer to both
+            row, col = rng_edges(data)
+            new_data = np.asarray(data)[row, col]
 
             # create a csr matrix in order to create a Network
             new_network = sp.csr_matrix((new_data, (row, col)), shape=(nb_data, nb_data))
@@ -82,7 +67,7 @@ class OWSIRNGraph(widget.OWWidget):
             items = Table(Domain([], metas=[StringVariable('label')]), [[i] for i in range(nb_data)])
 
             self.infoa.setText(
-                "Average edges per nodes : " + str(len(row_data) / nb_data))
+                "Average edges per nodes : " + str(len(row) / nb_data))
 
             # Send results
             self.Outputs.network.send(Network(items, new_network))
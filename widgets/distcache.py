@@ -0,0 +1,106 @@
+# On-disk cache of distance matrices, shared between sessions
+#
+# Created on 2026-10-19
+
+import hashlib
+import os
+
+import numpy as np
+import scipy.sparse as sp
+
+from Orange.misc.environ import cache_dir
+
+
+def default_directory():
+    return os.path.join(cache_dir(), "OrangeProjetSI", "distances")
+
+
+def fingerprint(data, **params):
+    """Hash the values and the domain of a table together with the
+    parameters of the metric; equal tables give equal fingerprints."""
+    sha = hashlib.sha1()
+    for var in data.domain.variables:
+        sha.update(repr((type(var).__name__, var.name,
+                         getattr(var, "values", None))).encode())
+    for array in (data.X, data.Y):
+        sha.update(repr((array.shape, sp.issparse(array))).encode())
+        if sp.issparse(array):
+            array = sp.csr_matrix(array)
+            parts = (array.data, array.indices, array.indptr)
+        else:
+            parts = (array,)
+        for part in parts:
+            part = np.ascontiguousarray(part)
+            sha.update(part.dtype.str.encode())
+            sha.update(part.data)
+    sha.update(repr(sorted(params.items())).encode())
+    return sha.hexdigest()
+
+
+class DistanceCache:
+    """Distance matrices stored as .npy files named by their fingerprint.
+
+    Cached matrices are memory-mapped when loaded. The least recently
+    used files are removed when the cache grows beyond `max_bytes`."""
+
+    def __init__(self, directory=None, max_bytes=1 << 30):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npy")
+
+    def get(self, key):
+        """Return the memory-mapped matrix stored under key, or None."""
+        path = self._path(key)
+        try:
+            matrix = np.load(path, mmap_mode="r", allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass  # e.g. a read-only cache; the matrix is still good
+        return matrix
+
+    def put(self, key, matrix):
+        """Store the matrix under key; matrices larger than the whole
+        cache are not stored."""
+        matrix = np.asarray(matrix)
+        if matrix.nbytes > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        # write aside and rename, so a matrix is never read half written
+        tmp = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp, "wb") as f:
+            np.save(f, matrix, allow_pickle=False)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Remove least recently used matrices until the cache fits;
+        the file `keep` is never removed."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".npy") and entry.path != keep:
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if keep is not None:
+            total += os.path.getsize(keep)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".npy"):
+                    os.remove(os.path.join(self.directory, name))
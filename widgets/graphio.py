@@ -0,0 +1,148 @@
+# Reading and writing graphs as CSR arrays on disk
+#
+# Created on 2026-10-19
+
+import os
+import warnings
+
+import numpy as np
+import scipy.sparse as sp
+
+# Files of a raw (memory-mappable) graph directory
+RAW_FILES = ("indptr", "indices", "weights", "labels", "header")
+
+
+def _label_array(labels):
+    """Numeric labels are kept numeric, so that loading them does not
+    create a Python string per node; others are stored as strings."""
+    labels = np.asarray(labels)
+    if labels.dtype.kind not in "iufU":
+        labels = labels.astype(str)
+    return labels
+
+
+def save_npz(filename, matrix, labels, directed=False):
+    """Save a graph as a single compressed .npz file."""
+    matrix = sp.csr_matrix(matrix)
+    np.savez_compressed(
+        filename, indptr=matrix.indptr, indices=matrix.indices,
+        weights=matrix.data, labels=_label_array(labels),
+        header=np.array([matrix.shape[0], int(directed)]))
+
+
+def load_npz(filename):
+    """Load a graph saved by `save_npz`, return (matrix, labels, directed)."""
+    with np.load(filename, allow_pickle=False) as f:
+        n, directed = f["header"]
+        matrix = sp.csr_matrix(
+            (f["weights"], f["indices"], f["indptr"]), shape=(n, n))
+        return matrix, f["labels"], bool(directed)
+
+
+def save_raw(directory, matrix, labels, directed=False):
+    """Save a graph as uncompressed .npy arrays in a directory, so that
+    `load_raw` can memory-map them instead of reading them."""
+    matrix = sp.csr_matrix(matrix)
+    os.makedirs(directory, exist_ok=True)
+    arrays = (matrix.indptr, matrix.indices, matrix.data,
+              _label_array(labels),
+              np.array([matrix.shape[0], int(directed)]))
+    for name, array in zip(RAW_FILES, arrays):
+        np.save(os.path.join(directory, name + ".npy"), array)
+
+
+def load_raw(directory, mmap=True):
+    """Load a graph saved by `save_raw`, return (matrix, labels, directed).
+
+    With `mmap`, the index and weight arrays are mapped read-only and
+    only paged in from disk when they are used."""
+    mode = "r" if mmap else None
+    indptr, indices, weights, labels, header = (
+        np.load(os.path.join(directory, name + ".npy"),
+                mmap_mode=mode, allow_pickle=False)
+        for name in RAW_FILES)
+    n, directed = header
+    # the constructor would copy the arrays when checking them
+    matrix = sp.csr_matrix((int(n), int(n)))
+    matrix.data, matrix.indices, matrix.indptr = weights, indices, indptr
+    return matrix, np.asarray(labels), bool(directed)
+
+
+def read_edge_list(filename, directed=False):
+    """Read a whitespace or comma separated edge list with two (source,
+    target) or three (source, target, weight) numeric columns.
+
+    The whole file is parsed by numpy in a single call; lines starting
+    with '#' or '%' and a non-numeric header line are skipped. Node ids
+    are renumbered to 0..n-1 and the original (numeric) ids are returned
+    as labels.
+
+    Undirected edges are stored once, in the upper triangle; when an edge
+    is listed more than once (in either direction), the first weight is
+    kept."""
+    with open(filename, "rb") as f:
+        text = f.read()
+    # headers are usually only at the top, cut them without splitting lines
+    while text.lstrip().startswith((b"#", b"%")):
+        text = text.lstrip().partition(b"\n")[2]
+    if b"#" in text or b"%" in text:
+        text = b"\n".join(line for line in text.splitlines()
+                          if not line.lstrip().startswith((b"#", b"%")))
+    text = text.replace(b",", b" ").lstrip()
+    first, _, rest = text.partition(b"\n")
+    try:
+        [float(x) for x in first.split()]
+    except ValueError:
+        # header with column names, e.g. "source target weight"
+        text = rest.lstrip()
+        first = text.partition(b"\n")[0]
+    ncols = len(first.split())
+    if ncols not in (2, 3):
+        raise ValueError("edge list must have 2 or 3 columns")
+
+    # numpy stops at the first non-numeric value, with a warning
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(text, sep=" ")
+        except (DeprecationWarning, ValueError):
+            raise ValueError("edge list contains non-numeric values") from None
+    counts = _columns_per_line(text)
+    if np.any(counts != ncols) or values.size != counts.size * ncols:
+        raise ValueError("edge list lines have different numbers of columns")
+    values = values.reshape(-1, ncols)
+
+    ids, nodes = _renumber(values[:, :2])
+    weights = values[:, 2] if ncols == 3 else np.ones(len(values))
+    n = len(ids)
+    rows, cols = nodes[:, 0], nodes[:, 1]
+    if not directed:
+        rows, cols = np.minimum(rows, cols), np.maximum(rows, cols)
+        _, first = np.unique(rows * n + cols, return_index=True)
+        rows, cols, weights = rows[first], cols[first], weights[first]
+    matrix = sp.csr_matrix((weights, (rows, cols)), shape=(n, n))
+    return matrix, ids, directed
+
+
+def _columns_per_line(text):
+    """Number of values on each non-blank line of the (comma-free) text."""
+    chars = np.frombuffer(text, dtype=np.uint8)
+    space = np.isin(chars, np.frombuffer(b" \t\r\n\v\f", dtype=np.uint8))
+    starts = np.flatnonzero(~space & np.concatenate(([True], space[:-1])))
+    lines = np.searchsorted(np.flatnonzero(chars == ord("\n")), starts)
+    counts = np.bincount(lines)
+    return counts[counts > 0]
+
+
+def _renumber(ids):
+    """Map node ids to 0..n-1, return (sorted unique ids, new ids)."""
+    if len(ids) and np.all(ids == np.round(ids)):
+        ids = ids.astype(np.int64)
+        # dense non-negative integer ids: linear time instead of sorting
+        if ids.min() >= 0 and ids.max() < 4 * ids.size:
+            present = np.zeros(ids.max() + 1, dtype=bool)
+            present[ids] = True
+            renumbering = np.cumsum(present) - 1
+            return np.flatnonzero(present), renumbering[ids]
+    unique, inverse = np.unique(ids, return_inverse=True)
+    return unique, inverse.reshape(ids.shape)
@@ -0,0 +1,125 @@
+# Neighbor indices that are updated when rows are appended to the
+# distance matrix, instead of being rebuilt from the whole matrix
+#
+# Created on 2026-10-19
+
+import numpy as np
+import scipy.sparse as sp
+from Orange.data import Table
+
+from .kernels import knn, k_smallest
+
+# Rows of the old matrix compared with the new one to tell whether
+# the new matrix extends it
+CHECKED_ROWS = 8
+
+
+def is_extension(old, new):
+    """Return True if the distance matrix `new` is `old` with rows (and
+    the corresponding columns) appended at the end.
+
+    A few rows of the old block are compared, which keeps the test cheap;
+    Table row items must also have the same ids. Ids alone are not enough:
+    they are kept when the data is transformed and the distances change."""
+    if old is None or new is None:
+        return False
+    m = old.shape[0]
+    if new.shape[0] <= m:
+        return False
+    old_items, new_items = old.row_items, new.row_items
+    if isinstance(old_items, Table) and isinstance(new_items, Table) \
+            and not np.array_equal(old_items.ids, new_items.ids[:m]):
+        return False
+    rows = np.unique(np.linspace(0, m - 1, CHECKED_ROWS).astype(int))
+    return np.array_equal(np.asarray(old)[rows], np.asarray(new)[rows, :m])
+
+
+def merge_values(values, matrix, m):
+    """Return the sorted values of the distance matrix, given the sorted
+    values of its first m rows and columns; only the new rows are sorted."""
+    new_rows = np.asarray(matrix)[m:]
+    # new rows, and the new columns of the old rows (by symmetry)
+    new_values = np.sort(np.concatenate((new_rows.ravel(), new_rows[:, :m].ravel())))
+    return np.insert(values, np.searchsorted(values, new_values), new_values)
+
+
+class KNNIndex:
+    """The k nearest neighbors of each point, with their distances."""
+
+    def __init__(self, matrix, k):
+        self.k = k
+        self.matrix = matrix
+        self.nearest = knn(matrix, k)
+        self.distances = np.take_along_axis(
+            np.asarray(matrix), self.nearest, axis=1)
+
+    def __len__(self):
+        return len(self.nearest)
+
+    def insert(self, matrix):
+        """Add the points appended to the distance matrix. Only the new
+        rows and columns of `matrix` are read."""
+        m = len(self)
+        matrix = np.asarray(matrix)
+        n = matrix.shape[0]
+
+        # neighbors of the new points
+        new_rows = matrix[m:]
+        new_nearest = knn(new_rows, self.k)
+        new_distances = np.take_along_axis(new_rows, new_nearest, axis=1)
+
+        # new points that enter the neighborhoods of the old ones
+        candidates = matrix[:m, m:]
+        distances, nearest = k_smallest(
+            np.hstack((self.distances, candidates)), self.k,
+            np.hstack((self.nearest,
+                       np.broadcast_to(np.arange(m, n), candidates.shape))))
+
+        self.nearest = np.vstack((nearest, new_nearest))
+        self.distances = np.vstack((distances, new_distances))
+        self.matrix = matrix
+
+    def csr(self):
+        n, k = self.nearest.shape
+        return sp.csr_matrix(
+            (self.distances.ravel(), self.nearest.ravel(), np.arange(n + 1) * k),
+            shape=(n, n))
+
+
+class EpsilonIndex:
+    """All pairs of points at distance at most epsilon, in both directions
+    and including each point with itself."""
+
+    def __init__(self, matrix, epsilon):
+        self.epsilon = epsilon
+        self.matrix = matrix
+        mask = np.asarray(matrix) <= epsilon
+        self.rows, self.cols = mask.nonzero()
+        self.distances = np.asarray(matrix)[mask]
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def insert(self, matrix):
+        """Add the points appended to the distance matrix. Only the new
+        rows of `matrix` are read; the matrix is symmetric."""
+        m = len(self)
+        new_rows = np.asarray(matrix)[m:]
+        rows, cols = (new_rows <= self.epsilon).nonzero()
+        distances = new_rows[rows, cols]
+        rows += m
+        # edges from the old points to the new ones
+        old = cols < m
+        self.rows = np.concatenate((self.rows, rows, cols[old]))
+        self.cols = np.concatenate((self.cols, cols, rows[old]))
+        self.distances = np.concatenate(
+            (self.distances, distances, distances[old]))
+        self.matrix = matrix
+
+    def csr(self):
+        """Adjacency weighted as max distance minus distance."""
+        n = len(self)
+        weights = self.distances
+        if weights.size:
+            weights = np.max(weights) - weights
+        return sp.csr_matrix((weights, (self.rows, self.cols)), shape=(n, n))
@@ -0,0 +1,198 @@
+# Inner loops of the distance and graph widgets
+#
+# Every kernel has a NumPy implementation. When numba is installed, a
+# compiled version running in parallel over the rows is used instead;
+# `set_backend` switches between them at run time (e.g. for benchmarks).
+# The kNN selection has no compiled version: np.partition is faster than
+# a sort per row in numba.
+#
+# Created on 2026-10-19
+
+from contextlib import contextmanager
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.spatial.distance import cdist
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMPY, NUMBA = "numpy", "numba"
+_backend = NUMBA if numba is not None else NUMPY
+
+
+def available_backends():
+    return [NUMPY] + ([NUMBA] if numba is not None else [])
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(name):
+    """Select the implementation used by the kernels ('numpy' or 'numba')."""
+    global _backend
+    if name not in available_backends():
+        raise ValueError("backend '%s' is not available" % name)
+    _backend = name
+
+
+@contextmanager
+def backend(name):
+    """Temporarily use another backend."""
+    previous = get_backend()
+    set_backend(name)
+    try:
+        yield
+    finally:
+        set_backend(previous)
+
+
+# Distances for mixed continuous/discrete data
+
+def mixed_distances(continuous, discrete, nb_columns):
+    """Distances between rows: the euclidean distance over the continuous
+    columns (already scaled to [0, 1]) plus the number of different
+    discrete values, divided by the total number of columns."""
+    continuous = np.ascontiguousarray(continuous, dtype=np.float64)
+    discrete = np.ascontiguousarray(discrete, dtype=np.float64)
+    if _backend == NUMBA:
+        return _mixed_distances_numba(continuous, discrete, nb_columns)
+    return _mixed_distances_numpy(continuous, discrete, nb_columns)
+
+
+def _mixed_distances_numpy(continuous, discrete, nb_columns):
+    # exact differences; expanding |a - b|^2 loses precision for close rows
+    distances = cdist(continuous, continuous)
+    for column in discrete.T:
+        distances += column[:, None] != column[None, :]
+    distances /= nb_columns
+    np.fill_diagonal(distances, 0)
+    return distances
+
+
+# Relative neighborhood graph
+
+def rng_edges(matrix):
+    """Return the (rows, cols) of the relative neighborhood graph: i and j
+    are connected unless some k is closer than d(i, j) to both of them."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    if _backend == NUMBA:
+        keep = _rng_mask_numba(matrix)
+    else:
+        keep = _rng_mask_numpy(matrix)
+    return np.nonzero(keep)
+
+
+def _rng_mask_numpy(matrix):
+    keep = np.empty(matrix.shape, dtype=bool)
+    for i, row in enumerate(matrix):
+        # closest[j] = min over k of max(d(i, k), d(j, k)); k = i and k = j
+        # give d(i, j) itself, which never removes the edge
+        closest = np.maximum(row, matrix).min(axis=1)
+        keep[i] = closest >= row
+    return keep
+
+
+# k nearest neighbors
+
+def knn(matrix, k):
+    """Return the indices of the k smallest distances of each row,
+    sorted by increasing distance, as an array of shape (rows, k).
+    The matrix may be a block of rows of a distance matrix."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    return k_smallest(matrix, k)[1]
+
+
+def k_smallest(distances, k, indices=None):
+    """Keep the k (distance, index) pairs with the smallest distances in
+    each row, ordered by distance then index, as when sorting the pairs;
+    return (distances, indices). Without `indices`, the column numbers
+    are the indices."""
+    rows, n = distances.shape
+    if indices is None:
+        indices = np.broadcast_to(np.arange(n), distances.shape)
+    else:
+        by_index = np.argsort(indices, axis=1, kind="stable")
+        distances = np.take_along_axis(distances, by_index, axis=1)
+        indices = np.take_along_axis(indices, by_index, axis=1)
+    if k < n:
+        kth = np.partition(distances, k - 1, axis=1)[:, k - 1:k]
+        below = distances < kth
+        ties = distances == kth
+        # among the ties at the k-th distance, take the smallest indices;
+        # columns are in the order of indices, so the first ones
+        missing = k - below.sum(axis=1, keepdims=True)
+        keep = below | (ties & (np.cumsum(ties, axis=1, dtype=np.int32) <= missing))
+        distances = distances[keep].reshape(rows, k)
+        indices = indices[keep].reshape(rows, k)
+    order = np.lexsort((indices, distances), axis=1)
+    return (np.take_along_axis(distances, order, axis=1),
+            np.take_along_axis(indices, order, axis=1))
+
+
+# Graphs derived from the kNN lists; sparse products need no compiled version
+
+def knn_matrix(nearest, n):
+    """Binary CSR matrix with a 1 at (i, j) when j is a neighbor of i."""
+    k = nearest.shape[1]
+    indptr = np.arange(n + 1) * k
+    return sp.csr_matrix(
+        (np.ones(n * k), nearest.ravel(), indptr), shape=(n, n))
+
+
+def mutual_knn(nearest, n):
+    """Pairs (i, j) where each is among the neighbors of the other."""
+    adjacency = knn_matrix(nearest, n)
+    mutual = adjacency.multiply(adjacency.T).tocsr()
+    mutual.setdiag(0)
+    mutual.eliminate_zeros()
+    return mutual
+
+
+def shared_neighbors(nearest, n, min_shared=1):
+    """Shared nearest neighbors graph: the weight of (i, j) is the number
+    of points in both kNN lists; pairs sharing fewer than min_shared
+    neighbors are pruned."""
+    adjacency = knn_matrix(nearest, n)
+    shared = (adjacency @ adjacency.T).tocsr()
+    shared.setdiag(0)
+    shared.data[shared.data < min_shared] = 0
+    shared.eliminate_zeros()
+    return shared
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _mixed_distances_numba(continuous, discrete, nb_columns):
+        n = continuous.shape[0]
+        distances = np.zeros((n, n))
+        for i in numba.prange(n):
+            for j in range(i + 1, n):
+                squares = 0.
+                for c in range(continuous.shape[1]):
+                    diff = continuous[i, c] - continuous[j, c]
+                    squares += diff * diff
+                different = 0
+                for c in range(discrete.shape[1]):
+                    if discrete[i, c] != discrete[j, c]:
+                        different += 1
+                d = (np.sqrt(squares) + different) / nb_columns
+                distances[i, j] = d
+                distances[j, i] = d
+        return distances
+
+    @numba.njit(parallel=True, cache=True)
+    def _rng_mask_numba(matrix):
+        n = matrix.shape[0]
+        keep = np.ones((n, n), dtype=np.bool_)
+        for i in numba.prange(n):
+            for j in range(n):
+                d = matrix[i, j]
+                for k in range(n):
+                    if matrix[i, k] < d and matrix[j, k] < d:
+                        keep[i, j] = False
+                        break
+        return keep
@@ -0,0 +1,85 @@
+# Union-find (disjoint sets) used to follow connected components while
+# edges are added in increasing order of distance
+#
+# Created on 2026-10-19
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class UnionFind:
+    """Disjoint sets over the nodes 0..n-1 with union by size."""
+
+    def __init__(self, n):
+        # plain lists are much faster than numpy arrays for scalar access
+        self.parent = list(range(n))
+        self.size = [1] * n
+        self.components = n
+        self.largest = 1 if n else 0
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # path halving
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        """Merge the sets of a and b, return True if they were distinct."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.components -= 1
+        if self.size[a] > self.largest:
+            self.largest = self.size[a]
+        return True
+
+
+def sorted_edges(matrix):
+    """Return the (row, col, distance) arrays of the upper triangle of a
+    symmetric distance matrix, sorted by increasing distance.
+    Indices are int32, since the arrays are kept alongside the matrix."""
+    matrix = np.asarray(matrix)
+    rows, cols = np.triu_indices(matrix.shape[0], 1)
+    weights = matrix[rows, cols]
+    order = np.argsort(weights, kind="stable")
+    return (rows[order].astype(np.int32), cols[order].astype(np.int32),
+            weights[order])
+
+
+def component_sweep(rows, cols, weights, n):
+    """Add sorted edges one by one and record every merge.
+
+    Returns the arrays (thresholds, number of components, size of the
+    largest component); the first entry describes the graph without edges.
+    The sweep stops as soon as the graph is connected."""
+    uf = UnionFind(n)
+    thresholds = [0.]
+    components = [n]
+    largest = [uf.largest]
+    for i, j, w in zip(rows.tolist(), cols.tolist(), weights.tolist()):
+        if uf.union(i, j):
+            thresholds.append(w)
+            components.append(uf.components)
+            largest.append(uf.largest)
+            if uf.components == 1:
+                break
+    return np.array(thresholds), np.array(components), np.array(largest)
+
+
+def threshold_edges(rows, cols, weights, n, epsilon):
+    """Build the symmetric adjacency of the epsilon graph from a prefix
+    of the sorted edges, with the same weights as the dense construction
+    (max distance minus distance, self loops included)."""
+    end = np.searchsorted(weights, epsilon, side="right")
+    diagonal = np.arange(n)
+    row = np.concatenate((rows[:end], cols[:end], diagonal))
+    col = np.concatenate((cols[:end], rows[:end], diagonal))
+    dist = np.concatenate((weights[:end], weights[:end], np.zeros(n)))
+    if dist.size:
+        dist = np.max(dist) - dist
+    return sp.csr_matrix((dist, (row, col)), shape=(n, n))